@@ -6,23 +6,49 @@
         - email (optional attribute)
         - address (optional attribute)
 '''
+from contextlib import contextmanager
 from datetime import datetime
+import sys
 
 class Contact:
+    # Fixed attribute layout, avoiding a per-instance __dict__
+    __slots__ = ('first_name', 'last_name', 'phone_number', 'email', 'address',
+                 'time_created', 'time_updated', 'update_history', 'search_blob')
+
+    # Timestamp shared by every contact created or updated inside batch_timestamp()
+    _frozen_now = None
+
+    '''Freeze the timestamp used for creating and updating contacts for the duration of a batch operation.'''
+    @classmethod
+    @contextmanager
+    def batch_timestamp(cls):
+        previous = cls._frozen_now
+        cls._frozen_now = datetime.now().replace(microsecond=0)
+        try:
+            yield cls._frozen_now
+        finally:
+            cls._frozen_now = previous
+
+    '''Return the current time without microseconds, or the frozen batch timestamp if one is set.'''
+    @classmethod
+    def _now(cls):
+        return cls._frozen_now or datetime.now().replace(microsecond=0)
+
     '''Constructor to create a new contact with the given input attributes.'''
     def __init__(self, first_name, last_name, phone_number, email=None, address=None):
-        self.first_name = first_name
-        self.last_name = last_name
+        # Names repeat often across contacts, so share one copy of each string
+        self.first_name = sys.intern(first_name)
+        self.last_name = sys.intern(last_name)
         self.phone_number = phone_number
         self.email = email
         self.address = address
+        self.refresh_search_blob()
 
         # Time created and updated are the same when the contact is first created.
-        self.time_created = datetime.now().replace(microsecond=0)
-        self.time_updated = datetime.now().replace(microsecond=0)
+        self.time_created = self.time_updated = self._now()
 
-        # Store the history of updates
-        self.update_history = []
+        # Store the history of updates, created on the first update
+        self.update_history = None
 
     '''Update the contact with the given input attributes and store the change history.'''
     def update(self, first_name=None, last_name=None, phone_number=None, email=None, address=None):
@@ -36,20 +62,23 @@ class Contact:
 
         # Check to see which attributes need to be updated.
         if first_name:
-            self.first_name = first_name
+            self.first_name = sys.intern(first_name)
         if last_name:
-            self.last_name = last_name
+            self.last_name = sys.intern(last_name)
         if phone_number:
             self.phone_number = phone_number
         if email:
             self.email = email
         if address:
             self.address = address
+        self.refresh_search_blob()
 
         # Modify the updated time to the current time.
-        self.time_updated = datetime.now().replace(microsecond=0)
+        self.time_updated = self._now()
 
         # Add the changes to update history log
+        if self.update_history is None:
+            self.update_history = []
         self.update_history.append({
             'time_updated': self.time_updated,
             'old_values': old_values,
@@ -62,6 +91,11 @@ class Contact:
             }
         })
 
+    '''Rebuild the lowercased text searched by the phone book: the full name and the phone number.
+       The fields are separated by a unit separator (\\x1f), which the phone book strips from queries, so a query cannot match across them.'''
+    def refresh_search_blob(self):
+        self.search_blob = f"{self.first_name} {self.last_name}\x1f{self.phone_number}".lower()
+
     '''View the update history for the contact.'''
     def view_update_history(self):
         print(f"\n--- Update History for {self.first_name} {self.last_name} ---")
@@ -73,16 +107,21 @@ class Contact:
                 print(f"  Old values: {update['old_values']}")
                 print(f"  New values: {update['new_values']}")
 
-    '''Define equality between two contact objects based on their core attributes.'''
+    '''Define equality between two contact objects based on their core attributes.
+       The phone number is compared first since it is the attribute most likely to differ.'''
     def __eq__(self, other):
         if not isinstance(other, Contact):
             return False
-        return (self.first_name == other.first_name and
+        return (self.phone_number == other.phone_number and
                 self.last_name == other.last_name and
-                self.phone_number == other.phone_number and
+                self.first_name == other.first_name and
                 self.email == other.email and
                 self.address == other.address)
 
+    '''Hash a contact by its identifying attributes, consistent with equality.'''
+    def __hash__(self):
+        return hash((self.phone_number, self.last_name, self.first_name))
+
     '''Return a string representation of the contact.'''
     def __str__(self):
         return (f"\n{'-'*40}\n"
@@ -3,52 +3,58 @@
     To run the application: python main.py
 '''
 
-from phonebook import PhoneBook
+from phonebook import PhoneBook, is_valid_phone, is_valid_email
 from contact import Contact
 import os
-import re
+import sys
 
 # ANSI escape codes for colors
 RED = "\033[91m"
 GREEN = "\033[92m"
 RESET = "\033[0m"
 
+# Main menu text, written to stdout in a single call
+MENU = "\n".join([
+    "",
+    "--- Phonebook Main Menu ---",
+    " 1. Add Contact",
+    " 2. View All Contacts",
+    " 3. Search Contacts",
+    " 4. Update Contact",
+    " 5. Delete Contact",
+    " 6. Batch Add Contacts (from CSV)",
+    " 7. Batch Delete Contacts (from CSV)",
+    " 8. Sort Contacts Alphabetically",
+    " 9. Group Contacts by Last Name Initial",
+    " 10. View Audit Log",
+    " 11. Exit",
+    "",
+    "",
+])
+
 
 ''' Helper functions for the command-line interface main menu. '''
 def display_menu():
     '''Display the menu options for the user.'''
-    print("\n--- Phonebook Main Menu ---")
-    print(" 1. Add Contact")
-    print(" 2. View All Contacts")
-    print(" 3. Search Contacts")
-    print(" 4. Update Contact")
-    print(" 5. Delete Contact")
-    print(" 6. Batch Add Contacts (from CSV)")
-    print(" 7. Batch Delete Contacts (from CSV)")
-    print(" 8. Sort Contacts Alphabetically")
-    print(" 9. Group Contacts by Last Name Initial")
-    print(" 10. View Audit Log")
-    print(" 11. Exit")
-    print()
-
+    sys.stdout.write(MENU)
 
-''' Helper function for validating input phone number format: (###) ###-#### '''
-def is_valid_phone(phone):
-    '''Check if the phone number is in the correct format.'''
-    return re.fullmatch(r"\(\d{3}\) \d{3}-\d{4}", phone) is not None
 
-
-''' Helper function for validating input email'''
-def is_valid_email(email):
-    '''Check if the email is in the correct format.'''
-    return re.fullmatch(r".+@.+\.com", email) is not None or not email  # Allow empty email
+''' Helper function for reading a line of input from the user.'''
+def read_input(prompt=""):
+    '''Write the prompt, flush buffered output and read one line from stdin (a lighter-weight input()).'''
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip("\n")
 
 
 ''' Helper function for getting and validating input from the user.'''
 def get_valid_input(prompt, validation_func, error_message):
     '''Helper function to get and validate input from the user.'''
     while True:
-        value = input(prompt)
+        value = read_input(prompt)
         if validation_func(value):
             return value
         else:
@@ -72,11 +78,11 @@ def get_contact_details():
         is_valid_phone,
         "Error: Invalid phone number format. It must be (###) ###-####."
     )
-    email = input("Enter email (optional): ")
+    email = read_input("Enter email (optional): ")
     if email and not is_valid_email(email):
         print(f"{RED}Error: Invalid email format. It must be in the format username@domain.com.{RESET}")
-        email = input("Enter email (optional): ")
-    address = input("Enter address (optional): ")
+        email = read_input("Enter email (optional): ")
+    address = read_input("Enter address (optional): ")
     
     return Contact(first_name, last_name, phone_number, email, address)
 
@@ -95,14 +101,15 @@ def view_contacts(phonebook):
 
 '''Search contacts by name or phone number.'''
 def search_contacts(phonebook):
-    search_string = input("Enter name or phone number to search: ")
+    search_string = read_input("Enter name or phone number to search: ")
     phonebook.search_contacts(search_string)
 
 
 '''Update an existing contact in the phonebook.'''
 def update_contact(phonebook):
-    search_string = input("Enter the full name of the contact to update: ")
-    matches = phonebook.search_contacts(search_string)
+    search_string = read_input("Enter the full name of the contact to update: ")
+    matches = phonebook.match_contacts(search_string)
+    phonebook.log_search(search_string, matches)
     
     if matches:
         print("\n--- Select Contact to Update ---")
@@ -112,7 +119,7 @@ def update_contact(phonebook):
         # Validate input for contact selection
         while True:
             try:
-                choice = int(input("\nEnter the number of the contact to update: ")) - 1
+                choice = int(read_input("\nEnter the number of the contact to update: ")) - 1
                 
                 if 0 <= choice < len(matches):
                     contact = matches[choice]
@@ -122,25 +129,10 @@ def update_contact(phonebook):
             except ValueError:
                 print(f"{RED}Error: Invalid input. Please enter a number.{RESET}")
 
-        # Define validation functions
-        def is_valid_phone(phone):
-            return re.fullmatch(r"\(\d{3}\) \d{3}-\d{4}", phone) is not None
-
-        def is_valid_email(email):
-            return re.fullmatch(r".+@.+\.com", email) is not None or not email  # Allow empty email
-
-        def get_valid_input(prompt, validation_func, error_message):
-            while True:
-                value = input(prompt)
-                if validation_func(value):
-                    return value
-                else:
-                    print(f"{RED}{error_message}{RESET}")
-
         # Validate and get new details
         print("\n--- Enter New Details (Leave blank to keep current values) ---")
-        first_name = input(f"Enter new first name (current: {contact.first_name}): ") or contact.first_name
-        last_name = input(f"Enter new last name (current: {contact.last_name}): ") or contact.last_name
+        first_name = read_input(f"Enter new first name (current: {contact.first_name}): ") or contact.first_name
+        last_name = read_input(f"Enter new last name (current: {contact.last_name}): ") or contact.last_name
         
         phone_number_prompt = f"Enter new phone number (current: {contact.phone_number}): "
         phone_number = get_valid_input(
@@ -156,7 +148,7 @@ def update_contact(phonebook):
             "Error: Invalid email format. It must be in the format username@domain.com."
         ) or contact.email
         
-        address = input(f"Enter new address (current: {contact.address}): ") or contact.address
+        address = read_input(f"Enter new address (current: {contact.address}): ") or contact.address
         
         # Update contact with validated values
         phonebook.update_contact(contact, first_name, last_name, phone_number, email, address)
@@ -166,14 +158,14 @@ def update_contact(phonebook):
 
 '''Delete an existing contact from the phonebook based on the full name.'''
 def delete_contact(phonebook):
-    full_name = input("Enter the full name of the contact to delete (First Last): ").strip()
+    full_name = read_input("Enter the full name of the contact to delete (First Last): ").strip()
     phonebook.delete_contact(full_name)
 
 
 '''Batch add contacts from an input CSV file. File must be placed in the data folder.'''
 def batch_add_contacts(phonebook):
     while True:
-        filename = input("Place your CSV file in the 'data' folder and enter the name of the file (e.g: testing.csv): ").strip()
+        filename = read_input("Place your CSV file in the 'data' folder and enter the name of the file (e.g: testing.csv): ").strip()
 
         # Check for empty input
         if not filename:
@@ -181,17 +173,15 @@ def batch_add_contacts(phonebook):
             continue  # Prompt the user again
         
         filepath = os.path.join('data', filename)
-        
-        if os.path.isfile(filepath):
-            phonebook.batch_add_contacts(filename)
+
+        # The phone book reports a missing file, in which case the user is prompted again
+        if phonebook.batch_add_contacts(filepath):
             break  # Exit the loop after successful operation
-        else:
-            print(f"{RED}Error: File '{filename}' not found in the 'data' folder. Please check the file name and try again.{RESET}")
 
 '''Batch delete contacts from an input CSV file. File must be placed in the data folder.'''
 def batch_delete_contacts(phonebook):
     while True:
-        filename = input("Place your CSV file in the 'data' folder and enter the name of the file (e.g: testing.csv): ").strip()
+        filename = read_input("Place your CSV file in the 'data' folder and enter the name of the file (e.g: testing.csv): ").strip()
 
         # Check for empty input
         if not filename:
@@ -199,26 +189,24 @@ def batch_delete_contacts(phonebook):
             continue  # Prompt the user again
         
         filepath = os.path.join('data', filename)
-        
-        if os.path.isfile(filepath):
-            phonebook.batch_delete_contacts(filename)
+
+        # The phone book reports a missing file, in which case the user is prompted again
+        if phonebook.batch_delete_contacts(filepath):
             break  # Exit the loop after successful operation
-        else:
-            print(f"{RED}Error: File '{filename}' not found in the 'data' folder. Please check the file name and try again.{RESET}")
 
 
 '''Sort contacts alphabetically by last name.'''
 def sort_contacts(phonebook):
-    phonebook.sort_contacts('alphabetical')
+    contacts = phonebook.sort_contacts('alphabetical')
     print(f"{GREEN}Contacts sorted alphabetically by last name.{RESET}")
-    phonebook.display_contacts()
+    phonebook.display_contacts(contacts)
 
 
 '''Group contacts by the initial letter of the last name.'''
 def group_contacts(phonebook):
-    phonebook.sort_contacts('group')
+    contacts = phonebook.sort_contacts('group')
     print(f"{GREEN}Contacts grouped by the first letter of last name.{RESET}")
-    phonebook.display_contacts()
+    phonebook.display_contacts(contacts)
 
 
 '''View the audit log of operations.'''
@@ -228,11 +216,15 @@ def view_audit_log(phonebook):
 
 '''Main function to run the phonebook application command-line loop.'''
 def main():
+    # Buffer output between prompts; read_input() flushes before waiting for the user.
+    # Some consoles (e.g. IDLE) replace sys.stdout with a stream that cannot be reconfigured.
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False)
     phonebook = PhoneBook()
 
     while True:
         display_menu()
-        choice = input("Choose an option: ")
+        choice = read_input("Choose an option: ")
 
         if choice == '1':
             add_contact(phonebook)
@@ -256,8 +248,10 @@ def main():
             view_audit_log(phonebook)
         elif choice == '11':
             phonebook.clear_audit_log()  # Clear the audit log
+            phonebook.close()
             print(f"{GREEN}Exiting the phonebook system. Goodbye!{RESET}")
             print("")
+            sys.stdout.flush()
             break
         else:
             print(f"{RED}Invalid option. Please try again.{RESET}")
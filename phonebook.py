@@ -4,9 +4,13 @@
 '''
 from contact import Contact
 from datetime import datetime
+from itertools import count
+from operator import itemgetter
+import bisect
 import csv
 import re
 import os
+import sys
 
 # ANSI escape codes for colors
 RED = "\033[91m"
@@ -14,98 +18,200 @@ GREEN = "\033[92m"
 BLUE = "\033[94m"
 RESET = "\033[0m"
 
+# Validation patterns compiled once at import time. They are anchored with \Z so that
+# match() checks the whole string, and the email character classes cannot cross '@'.
+PHONE_RE = re.compile(r"\(\d{3}\) \d{3}-\d{4}\Z")
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.com\Z")
+
+
+def is_valid_phone(phone):
+    '''Check if the phone number is in the correct format.'''
+    return PHONE_RE.match(phone) is not None
+
+
+def is_valid_email(email):
+    '''Check if the email is in the correct format.'''
+    return EMAIL_RE.match(email) is not None or not email  # Allow empty email
+
+
 class PhoneBook:
+    # Sort keys for each supported sort type
+    SORT_KEYS = {
+        'alphabetical': lambda x: x.last_name,
+        # Keep contacts within each initial ordered by last name, then first name
+        'group': lambda x: (x.last_name[:1].upper(), x.last_name, x.first_name),
+    }
+
     '''Constructor to create a new phone book with an empty contact list and audit log.'''
     def __init__(self):
         self.contacts_list = []
         self.audit_log_file = 'audit_log.txt'
 
+        # Keep the audit log open for the lifetime of the phone book; writes are buffered
+        self._log_fh = open(self.audit_log_file, 'a', buffering=8192)
+
+        # Index for exact lookups, keyed by lowercased full name
+        self._by_full_name = {}
+
+        # Search text of each contact, kept parallel to contacts_list so searches scan one flat list of strings
+        self._search_blobs = []
+
+        # Insertion sequence number of each contact, keyed by id(). contacts_list is only ever appended to
+        # or filtered, so it stays ordered by sequence number and a contact's position can be bisected.
+        self._sequence = {}
+        self._next_sequence = count()
+
+        # Sorted copies of the contact list keyed by sort type. Added and deleted contacts are
+        # inserted into / removed from the cached copies; other changes discard them.
+        self._sorted_cache = {}
+
     def log_operation(self, operation):
         '''Logs an operation with a timestamp into the audit log file.'''
-        with open(self.audit_log_file, 'a') as log_file:
-            log_file.write(f"{datetime.now()} - {operation}\n")
+        self._log_fh.write(f"{datetime.now()} - {operation}\n")
+
+    def log_operations(self, operations):
+        '''Logs a batch of operations sharing a single timestamp into the audit log file.'''
+        timestamp = datetime.now()
+        self._log_fh.writelines(f"{timestamp} - {operation}\n" for operation in operations)
+
+    def close(self):
+        '''Flushes and closes the audit log file.'''
+        self._log_fh.close()
+
+    def _index_contact(self, contact):
+        '''Adds a contact to the full name index, keeping each bucket in contact list order.'''
+        full_name = f"{contact.first_name} {contact.last_name}".lower()
+        bisect.insort(self._by_full_name.setdefault(full_name, []), contact, key=self._sequence_of)
+
+    def _unindex_contact(self, contact):
+        '''Removes a contact from the full name index.'''
+        full_name = f"{contact.first_name} {contact.last_name}".lower()
+        bucket = self._by_full_name[full_name]
+        # Locate by sequence number rather than equality: equal duplicates may share the bucket
+        del bucket[bisect.bisect_left(bucket, self._sequence_of(contact), key=self._sequence_of)]
+        if not bucket:
+            del self._by_full_name[full_name]
+
+    def _sequence_of(self, contact):
+        '''Returns the insertion sequence number of a contact in the phone book.'''
+        return self._sequence[id(contact)]
+
+    def _position(self, contact):
+        '''Returns the position of this exact contact object in the contact list.'''
+        return bisect.bisect_left(self.contacts_list, self._sequence_of(contact), key=self._sequence_of)
 
     '''Add a new contact to the phone book list and log the operation.'''
     def add_contact(self, contact):
+        self._sequence[id(contact)] = next(self._next_sequence)
         self.contacts_list.append(contact)
+        self._search_blobs.append(contact.search_blob)
+        self._index_contact(contact)
+
+        # Keep any cached sorted copies sorted rather than re-sorting them later
+        for sort_type, contacts in self._sorted_cache.items():
+            bisect.insort(contacts, contact, key=self.SORT_KEYS[sort_type])
         self.log_operation(f"Added contact: {contact.first_name} {contact.last_name}")
 
     '''Delete a contact from the phone book list and log the operation.'''
     def delete_contact(self, full_name):
         # Convert the input full name to lowercase for case-insensitive comparison
         full_name = full_name.lower()
-        contact_to_delete = None
-
-        # Search for the exact full name match in the contacts
-        for contact in self.contacts_list:
-            contact_full_name = f"{contact.first_name} {contact.last_name}".lower()
 
-            if contact_full_name == full_name:  # Exact match for full name
-                contact_to_delete = contact
-                break
+        # Look up the exact full name match in the index
+        matches = self._by_full_name.get(full_name)
 
-        if contact_to_delete:
-            self.contacts_list.remove(contact_to_delete)
+        if matches:
+            # Buckets are kept in list order, so this is the first matching contact in the list
+            contact_to_delete = matches[0]
+            position = self._position(contact_to_delete)
+            del self.contacts_list[position]
+            del self._search_blobs[position]
+            for contacts in self._sorted_cache.values():
+                del contacts[next(i for i, c in enumerate(contacts) if c is contact_to_delete)]
+            self._unindex_contact(contact_to_delete)
+            del self._sequence[id(contact_to_delete)]
             print(f"{GREEN}Contact '{full_name}' deleted successfully.{RESET}")
-            self.log_operation(f"Deleted contact: {contact_full_name}")
+            self.log_operation(f"Deleted contact: {full_name}")
         else:
             print(f"{RED}Error: No contact found with the full name '{full_name}'.{RESET}")
             self.log_operation(f"Failed to delete contact: {full_name}")
     
-    '''Batch add a group of contacts to the phone book list from a CSV file and log the operation.'''
-    def batch_add_contacts(self, filename):
-        filepath = os.path.join('data', filename)
-        if os.path.exists(filepath):
-            with open(filepath, mode='r') as file:
-                csv_reader = csv.reader(file)
-                headers = next(csv_reader, None)  # Read headers if they exist, else None
-                for row in csv_reader:
-                    # Handle optional fields
-                    first_name = row[0]
-                    last_name = row[1]
-                    phone_number = row[2]
-                    email = row[3] if len(row) > 3 else None
-                    address = row[4] if len(row) > 4 else None
-                    
-                    contact = Contact(first_name, last_name, phone_number, email, address)
-                    self.contacts_list.append(contact)
-            print(f"{GREEN}Contacts added successfully from CSV.{RESET}")
-            self.log_operation(f"Batch added contacts from file: {filename}")
-
-    '''Batch delete a group of contacts from the phone book list from a CSV file and log the operation.'''
-    def batch_delete_contacts(self, filename):
-        filepath = os.path.join('data', filename)
-        if os.path.exists(filepath):
-            with open(filepath, mode='r') as file:
-                csv_reader = csv.reader(file)
-                headers = next(csv_reader, None)  # Read headers if they exist, else None
-                for row in csv_reader:
-                    # Handle optional fields
-                    first_name = row[0]
-                    last_name = row[1]
-                    phone_number = row[2]
-                    email = row[3] if len(row) > 3 else None
-                    address = row[4] if len(row) > 4 else None
-                    
-                    contact = Contact(first_name, last_name, phone_number, email, address)
-                    try:
-                        self.contacts_list.remove(contact)
-                    except ValueError:
-                        print(f'Error: Contact {contact.first_name} {contact.last_name} does not exist.')
-            print(f"{GREEN}Contacts added successfully batch removed from CSV.{RESET}")
-            self.log_operation(f"Batch deleted contacts from file: {filename}")
+    '''Open a CSV file for a batch operation, printing an error and returning None if it cannot be found.'''
+    def _open_csv(self, filepath):
+        try:
+            return open(filepath, mode='r', newline='')
+        except (OSError, ValueError):  # Missing, a directory, unreadable, or an invalid path
+            print(f"{RED}Error: File '{os.path.relpath(filepath, 'data')}' not found in the 'data' folder. Please check the file name and try again.{RESET}")
+            return None
 
+    '''Batch add a group of contacts to the phone book list from a CSV file and log the operation.
+       Returns False if the file could not be found.'''
+    def batch_add_contacts(self, filepath):
+        file = self._open_csv(filepath)
+        if file is None:
+            return False
 
-    
-    '''Update a contact in the phone book list, log the operation and track the change history.'''
-    def update_contact(self, contact, first_name=None, last_name=None, phone_number=None, email=None, address=None):
-        # Define helper functions for validation
-        def is_valid_phone(phone):
-            return re.fullmatch(r"\(\d{3}\) \d{3}-\d{4}", phone) is not None
+        with file:
+            csv_reader = csv.reader(file)
+            headers = next(csv_reader, None)  # Read headers if they exist, else None
+
+            # All contacts in the batch share one creation timestamp. Missing optional
+            # fields (email, address) fall back to the Contact defaults.
+            start = len(self.contacts_list)
+            with Contact.batch_timestamp():
+                self.contacts_list.extend(Contact(*row[:5]) for row in csv_reader)
+
+        for contact in self.contacts_list[start:]:
+            self._sequence[id(contact)] = next(self._next_sequence)
+            self._index_contact(contact)
+            self._search_blobs.append(contact.search_blob)
+        self._sorted_cache.clear()
+        print(f"{GREEN}Contacts added successfully from CSV.{RESET}")
+        self.log_operation(f"Batch added contacts from file: {os.path.relpath(filepath, 'data')}")
+        return True
 
-        def is_valid_email(email):
-            return re.fullmatch(r".+@.+\..+", email) is not None or not email  # Allow empty email
+    '''Batch delete a group of contacts from the phone book list from a CSV file and log the operation.
+       Returns False if the file could not be found.'''
+    def batch_delete_contacts(self, filepath):
+        file = self._open_csv(filepath)
+        if file is None:
+            return False
 
+        log_lines = []
+        with file:
+            csv_reader = csv.reader(file)
+            headers = next(csv_reader, None)  # Read headers if they exist, else None
+
+            # Contacts are identified by first name, last name and phone number
+            rows = list(map(itemgetter(0, 1, 2), csv_reader))
+        to_delete = set(rows)
+
+        # Rebuild the list in a single pass, keeping the contacts that are not being deleted
+        kept = []
+        deleted_keys = set()
+        for contact in self.contacts_list:
+            key = (contact.first_name, contact.last_name, contact.phone_number)
+            if key in to_delete:
+                deleted_keys.add(key)
+                self._unindex_contact(contact)
+                del self._sequence[id(contact)]
+            else:
+                kept.append(contact)
+        self.contacts_list = kept
+        self._search_blobs = [contact.search_blob for contact in kept]
+        self._sorted_cache.clear()
+
+        for first_name, last_name, phone_number in rows:
+            if (first_name, last_name, phone_number) not in deleted_keys:
+                print(f'Error: Contact {first_name} {last_name} does not exist.')
+                log_lines.append(f"Failed to batch delete contact: {first_name} {last_name}")
+        print(f"{GREEN}Contacts added successfully batch removed from CSV.{RESET}")
+        log_lines.append(f"Batch deleted contacts from file: {os.path.relpath(filepath, 'data')}")
+        self.log_operations(log_lines)
+        return True
+
+    '''Update a contact in the phone book list, log the operation and track the change history.'''
+    def update_contact(self, contact, first_name=None, last_name=None, phone_number=None, email=None, address=None):
         # Backup the old values before updating
         old_values = {
             'first_name': contact.first_name,
@@ -126,90 +232,106 @@ class PhoneBook:
             return
 
         try:
-            # Update the contact with validated values
-            contact.first_name = first_name if first_name else contact.first_name
-            contact.last_name = last_name if last_name else contact.last_name
-            contact.phone_number = phone_number if phone_number else contact.phone_number
-            contact.email = email if email else contact.email
-            contact.address = address if address else contact.address
-
-            self.log_operation(f"Updated contact: {old_values} to {contact.__dict__}")
+            # Update the contact with validated values, re-keying it in the full name index
+            self._unindex_contact(contact)
+            contact.update(first_name, last_name, phone_number, email, address)
+            self._index_contact(contact)
+            self._search_blobs[self._position(contact)] = contact.search_blob
+            self._sorted_cache.clear()
+
+            # Log only the core attributes so each entry stays the same size regardless of update history
+            new_values = contact.update_history[-1]['new_values']
+            self.log_operation(f"Updated contact: {old_values} to {new_values}")
             print(f"{GREEN}Contact updated successfully!{RESET}")
         except Exception as e:
             print(f"{RED}Error: Invalid contact or update failed.{RESET}")
             self.log_operation(f"Attempted to update non-existent contact: {contact.first_name} {contact.last_name}. Error: {str(e)}")
     
-    '''Display all contacts in the phone book list.'''
-    def display_contacts(self):
-        if not self.contacts_list:
+    '''Display all contacts in the phone book list, or the given (e.g. sorted) list of contacts.'''
+    def display_contacts(self, contacts=None):
+        if contacts is None:
+            contacts = self.contacts_list
+
+        if not contacts:
             print("\nNo contacts available in the phonebook.")
             return
 
         print("\nPhonebook Contacts:")
         print("="*90)
 
-        for idx, contact in enumerate(self.contacts_list, 1):
+        for idx, contact in enumerate(contacts, 1):
             # Display each contact's details on one line
             print(f"{idx}. {contact.first_name} {contact.last_name} | Phone: {contact.phone_number} | Email: {contact.email if contact.email else 'N/A'} | Address: {contact.address if contact.address else 'N/A'}")
 
         print("="*90)
-        print(f"Total contacts: {len(self.contacts_list)}")
+        print(f"Total contacts: {len(contacts)}")
 
-    '''Wildcard searching with support for partial matches in names, phone numbers, and full names.'''
-    def search_contacts(self, search_string, start_date=None, end_date=None):
-        matches = []
-        search_string = search_string.lower()  # Make search case-insensitive
+    '''Return the contacts matching the search string, with support for partial matches in names, phone numbers, and full names.'''
+    def match_contacts(self, search_string, start_date=None, end_date=None):
+        # Make search case-insensitive, and drop the field separator used in the search text so
+        # a query cannot match across the name and phone number
+        search_string = search_string.lower().replace('\x1f', '')
 
-        for contact in self.contacts_list:
-            full_name = f"{contact.first_name} {contact.last_name}".lower()  # Full name for matching
-
-            # Check for matches in first name, last name, full name, or phone number
-            if (re.search(search_string, contact.first_name.lower()) or
-                re.search(search_string, contact.last_name.lower()) or
-                re.search(search_string, full_name) or
-                re.search(search_string, contact.phone_number)):
-
-                # Filter by date range if provided
-                if start_date and end_date:
-                    if start_date <= contact.time_created <= end_date:
-                        matches.append(contact)
-                else:
-                    matches.append(contact)
-
-        # Print matches
+        # A single check per contact covers the first name, last name, full name and phone number
+        matches = [contact for contact, blob in zip(self.contacts_list, self._search_blobs) if search_string in blob]
+
+        # Filter by date range if provided
+        if start_date and end_date:
+            matches = [contact for contact in matches if start_date <= contact.time_created <= end_date]
+
+        return matches
+
+    '''Display the results of a contact search.'''
+    def display_search_results(self, matches, search_string):
         if matches:
-            for contact in matches:
-                print(contact)
-                print()
+            # Build the output once and write it with a single print
+            print("\n\n".join(map(str, matches)), end="\n\n")
         else:
             print(f"{RED}No contacts found matching the search criteria: {search_string}{RESET}")
-        
-        # Log the search operation
+
+    '''Log a contact search and the number of matches found.'''
+    def log_search(self, search_string, matches):
         self.log_operation(f"Searched for contacts with query: {search_string}, found {len(matches)} matches")
-        
+
+    '''Wildcard searching with support for partial matches in names, phone numbers, and full names.'''
+    def search_contacts(self, search_string, start_date=None, end_date=None):
+        matches = self.match_contacts(search_string, start_date, end_date)
+        self.display_search_results(matches, search_string)
+
+        # Log the search operation
+        self.log_search(search_string, matches)
+
         return matches
     
-    '''Sort and group contacts based on various parameters like alphabetical sorting, or grouping by the initial letter of the last name and logs the operation.'''
+    '''Sort and group contacts based on various parameters like alphabetical sorting, or grouping by the initial letter of the last name and logs the operation.
+       Returns a sorted copy of the contact list (None for an invalid sort type); the insertion order of the phone book is preserved.'''
     def sort_contacts(self, sort_type):
         if sort_type == 'alphabetical':
-            self.contacts_list.sort(key=lambda x: x.last_name)
             self.log_operation("Sorted contacts alphabetically by last name.")
         elif sort_type == 'group':
-            self.contacts_list.sort(key=lambda x: x.last_name[0])
             self.log_operation("Grouped contacts by last name initial.")
         else:
             print('Error: Invalid sort type.')
             self.log_operation("Attempted to sort contacts with invalid sort type.")
+            return None
+
+        if sort_type not in self._sorted_cache:
+            self._sorted_cache[sort_type] = sorted(self.contacts_list, key=self.SORT_KEYS[sort_type])
+        return self._sorted_cache[sort_type]
 
     '''View the history of operations (audit log).'''
     def view_audit_log(self):
+        self._log_fh.flush()  # Make buffered entries visible to the reader
         with open(self.audit_log_file, 'r') as log_file:
-            print("\n" + BLUE + "--- Audit Log ---" + RESET)
-            for line in log_file:
-                print(" " + BLUE + line.strip() + RESET)
+            lines = log_file.read().splitlines()
+
+        # Colour each line, then write the whole log with a single call
+        sys.stdout.write("\n" + BLUE + "--- Audit Log ---" + RESET + "\n" +
+                         "".join(f" {BLUE}{line.strip()}{RESET}\n" for line in lines))
     
     '''Helper function to clear the audit log.'''
     def clear_audit_log(self):
         '''Clears the audit log file.'''
-        open(self.audit_log_file, 'w').close()  # Clear the content of the file
+        self._log_fh.seek(0)
+        self._log_fh.truncate()  # Clear the content of the file, discarding buffered entries
         print(f"{GREEN}Audit log has been cleared.{RESET}")
\ No newline at end of file